@@ -0,0 +1,72 @@
+# ============================================================
+# Persistent embedding cache: SHA-256(model + text) -> vector
+# ------------------------------------------------------------
+# - Backed by a single SQLite file (WAL mode)
+# - Process-global dict in front for hot-path lookups
+# ============================================================
+
+import hashlib
+import sqlite3
+
+import numpy as np
+
+SQLITE_MAX_PARAMS = 500  # keys per SELECT ... IN (...)
+
+
+class EmbeddingCache:
+    def __init__(self, path: str, model: str):
+        self.path = path
+        self.model = model
+        self.hot = {}
+        self._conn = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS emb (h BLOB PRIMARY KEY, v BLOB)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def key(self, text: str) -> bytes:
+        # The model name is part of the key so switching models never
+        # returns vectors from a different embedding space.
+        return hashlib.sha256(f"{self.model}\0{text}".encode("utf-8")).digest()
+
+    def get(self, text: str):
+        return self.get_many([text])[0]
+
+    def put(self, text: str, vec):
+        self.put_many([text], [vec])
+
+    def get_many(self, texts: list[str]) -> list:
+        """Return cached vectors for texts, with None for misses."""
+        keys = [self.key(t) for t in texts]
+
+        missing = list({k for k in keys if k not in self.hot})
+        for i in range(0, len(missing), SQLITE_MAX_PARAMS):
+            chunk = missing[i:i + SQLITE_MAX_PARAMS]
+            rows = self.conn.execute(
+                f"SELECT h, v FROM emb WHERE h IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            for h, v in rows:
+                self.hot[h] = np.frombuffer(v, dtype=np.float32)
+
+        return [self.hot.get(k) for k in keys]
+
+    def put_many(self, texts: list[str], vecs):
+        rows = []
+        for text, vec in zip(texts, vecs):
+            k = self.key(text)
+            v = np.asarray(vec, dtype=np.float32)
+            self.hot[k] = v
+            rows.append((k, v.tobytes()))
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO emb (h, v) VALUES (?, ?)", rows
+            )
@@ -1,22 +1,38 @@
 # ============================================================
 # Hybrid RAG for MID: Medicines Information Dataset (MID.xlsx) (Fully Local Version)
 # ------------------------------------------------------------
-# - Chat backend: Ollama (Mistral)
-# - Embeddings: Ollama bge-m3 (local, free)
-# - Vector DB: ChromaDB (local)
-# - SQL DB: SQLite (local)
+# - Chat backend: Ollama (Mistral), or llama.cpp llama-server
+# - Embeddings: Ollama bge-m3 (local, free), or text-embeddings-inference
+# - Vector DB: FAISS flat inner-product index (local)
+# - SQL DB: DuckDB (local, in-process)
 # ============================================================
 
 import os
-import sqlite3
+import asyncio
+import hashlib
+import pickle
+import shutil
+import subprocess
+import tempfile
+import numpy as np
 import pandas as pd
 import textwrap
 import json
 import re
 import time
 
+import aiohttp
+import duckdb
+import requests
 from ollama import Client as OllamaClient
-from chromadb import PersistentClient
+import faiss
+
+from embed_cache import EmbeddingCache
+
+try:
+    from numba import njit  # optional: JIT for the query cache scan
+except ImportError:
+    njit = None
 
 
 # ============================================================
@@ -25,16 +41,37 @@ from chromadb import PersistentClient
 
 
 MID_PATH = "path/to/your/MID.xlsx"
-DB_PATH = "mid.db"
+MID_CACHE_PATH = "mid_sheet.parquet"  # columnar copy of MID.xlsx
+DB_PATH = "mid.duckdb"
+MID_PARQUET_PATH = "mid.parquet"  # normalized table, memory-mapped at startup
 TABLE_NAME = "mid_drugs"
 
-CHROMA_DIR = "./chroma_mid_db"
-CHROMA_COLLECTION = "mid_vectors"
+FAISS_DIR = "./faiss_mid_db"
+FAISS_INDEX_PATH = os.path.join(FAISS_DIR, "mid_vectors.faiss")
+FAISS_DOCS_PATH = os.path.join(FAISS_DIR, "mid_docs.pkl")
+
+EMBED_CACHE_PATH = "embed_cache.db"
 
-MODEL_CHAT = "mistral"
+QUERY_CACHE_SIZE = 512
+QUERY_CACHE_THRESHOLD = 0.95  # cosine similarity for a cache hit
+
+MODEL_CHAT = "mistral:7b-instruct-q4_K_M"  # or "mistral:7b-instruct-q8_0"
 MODEL_EMBED = "bge-m3"
 
-ollama = OllamaClient(host="http://localhost:11434")
+CHAT_OPTIONS = {"num_ctx": 4096, "num_predict": 512}
+CHAT_KEEP_ALIVE = "15m"  # keep Mistral loaded between questions
+
+OLLAMA_HOST = "http://localhost:11434"
+EMBED_BATCH_SIZE = 64  # 128 is a good choice on CUDA hosts
+EMBED_PARALLEL = 2     # concurrent batch requests; match OLLAMA_NUM_PARALLEL
+
+# Optional faster backends; leave as None to use Ollama for everything.
+LLAMA_SERVER_URL = None  # llama.cpp llama-server, e.g. "http://localhost:8080"
+TEI_URL = None           # text-embeddings-inference, e.g. "http://localhost:8081"
+
+ollama = OllamaClient(host=OLLAMA_HOST)
+http = requests.Session()  # keep-alive for raw HTTP backend calls
+embed_cache = EmbeddingCache(EMBED_CACHE_PATH, MODEL_EMBED)
 
 
 # ============================================================
@@ -59,40 +96,74 @@ EXPECTED_COLUMNS = [
     "action_class",
 ]
 
+# Normalized header (lowercase, no spaces/underscores) -> expected name
+EXPECTED_BY_NORMALIZED = {c.replace("_", ""): c for c in EXPECTED_COLUMNS}
+
 
 # ============================================================
-# LOAD MID → SQLITE
+# LOAD MID → DUCKDB
 # ============================================================
 
-def load_mid_to_sqlite():
-    print("Loading MID.xlsx into SQLite...")
+def read_mid() -> pd.DataFrame:
+    """Read MID.xlsx through a parquet copy, refreshed when the sheet changes."""
+    if (
+        os.path.exists(MID_CACHE_PATH)
+        and (
+            not os.path.exists(MID_PATH)
+            or os.path.getmtime(MID_CACHE_PATH) >= os.path.getmtime(MID_PATH)
+        )
+    ):
+        return pd.read_parquet(MID_CACHE_PATH)
+
+    # xlsx2csv streams the sheet much faster than openpyxl, if it's installed
+    if shutil.which("xlsx2csv"):
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "mid.csv")
+            subprocess.run(["xlsx2csv", "-s", "1", MID_PATH, csv_path], check=True)
+            df = pd.read_csv(csv_path, engine="pyarrow")
+    else:
+        df = pd.read_excel(MID_PATH)
 
-    df = pd.read_excel(MID_PATH)
+    # Mixed-type text columns can't be written to parquet as-is
+    text_cols = df.select_dtypes(include=["object", "string"]).columns
+    df[text_cols] = df[text_cols].astype("string")
+    df.columns = df.columns.astype(str)
+
+    df.to_parquet(MID_CACHE_PATH, index=False)
+    return df
 
-    # Normalize column names
-    df.columns = [
-        c.strip().lower().replace(" ", "").replace("_", "")
-        for c in df.columns
-    ]
 
-    # Map normalized names to expected names
-    col_map = {}
-    for col in df.columns:
-        for expected in EXPECTED_COLUMNS:
-            if col == expected.replace("_", ""):
-                col_map[col] = expected
+def load_mid_to_duckdb():
+    global _db
+    print("Loading MID.xlsx into DuckDB...")
 
-    df = df.rename(columns=col_map)
-    df = df[[c for c in EXPECTED_COLUMNS if c in df.columns]]
+    df = read_mid()
 
+    # Normalize column names and map them to expected names
+    normalized = (
+        df.columns.astype(str)
+        .str.strip()
+        .str.lower()
+        .str.replace(" ", "", regex=False)
+        .str.replace("_", "", regex=False)
+    )
+    df.columns = [EXPECTED_BY_NORMALIZED.get(c, c) for c in normalized]
+    df = df.reindex(columns=[c for c in EXPECTED_COLUMNS if c in df.columns])
+
+    # The query connection is read-only, so drop it before rewriting the file
+    if _db is not None:
+        _db.close()
+        _db = None
     if os.path.exists(DB_PATH):
         os.remove(DB_PATH)
 
-    conn = sqlite3.connect(DB_PATH)
-    df.to_sql(TABLE_NAME, conn, if_exists="replace", index=False)
-    conn.close()
+    # DuckDB reads the DataFrame directly (via Arrow) in one vectorized pass
+    with duckdb.connect(DB_PATH) as con:
+        con.register("mid_df", df)
+        con.execute(f"CREATE TABLE {TABLE_NAME} AS SELECT * FROM mid_df")
+    df.to_parquet(MID_PARQUET_PATH, compression="zstd", index=False)
 
-    print("SQLite DB ready.")
+    print("DuckDB ready.")
     return df
 
 
@@ -100,113 +171,371 @@ def load_mid_to_sqlite():
 # SQL HELPERS
 # ============================================================
 
+DEFAULT_SQL = "SELECT * FROM mid_drugs LIMIT 10;"
+FALLBACK_NAME_SQL = "SELECT * FROM mid_drugs WHERE name ILIKE '%keyword%' LIMIT 10;"
+
+_SELECT_RE = re.compile(r"\bselect\b.*", re.IGNORECASE | re.DOTALL)
+_JOIN_RE = re.compile(r"\bjoin\b", re.IGNORECASE)
+_DRUG_NAME_RE = re.compile(r"drug_name", re.IGNORECASE)
+
+
 def extract_sql(text: str) -> str:
     """Extract SELECT query from LLM output."""
-    idx = text.lower().find("select")
-    if idx == -1:
-        return "SELECT * FROM mid_drugs LIMIT 10;"
-    sql = text[idx:].strip()
+    m = _SELECT_RE.search(text)
+    if not m:
+        return DEFAULT_SQL
+    sql = m.group(0).strip()
 
     # Safety: prevent hallucinated joins or invalid columns
-    if " join " in sql.lower():
-        return "SELECT * FROM mid_drugs LIMIT 10;"
-    if "drug_name" in sql.lower():
-        return "SELECT * FROM mid_drugs WHERE name LIKE '%keyword%' LIMIT 10;"
+    if _JOIN_RE.search(sql):
+        return DEFAULT_SQL
+    if _DRUG_NAME_RE.search(sql):
+        return FALLBACK_NAME_SQL
 
     return sql
 
 
+_db = None
+
+
+def get_db() -> duckdb.DuckDBPyConnection:
+    """Shared read-only connection for LLM-generated queries.
+
+    Read-only plus no external access means a generated query can neither
+    modify the table nor read files from disk.
+    """
+    global _db
+    if _db is None:
+        _db = duckdb.connect(
+            DB_PATH,
+            read_only=True,
+            config={"enable_external_access": False},
+        )
+    return _db
+
+
 def run_sql(sql: str) -> pd.DataFrame:
-    conn = sqlite3.connect(DB_PATH)
-    try:
-        return pd.read_sql_query(sql, conn)
-    finally:
-        conn.close()
+    return get_db().execute(sql).df()
 
 
 # ============================================================
-# CHROMA VECTOR STORE
+# QUERY CACHE
 # ============================================================
 
-def get_collection():
-    client = PersistentClient(path=CHROMA_DIR)
-    try:
-        return client.get_collection(CHROMA_COLLECTION)
-    except:
-        return client.create_collection(
-            CHROMA_COLLECTION,
-            metadata={"hnsw:space": "cosine"}
+def _best_match_numpy(Q, norms, q, qnorm):
+    sims = Q @ q / (norms * qnorm)
+    i = int(sims.argmax())
+    return i, float(sims[i])
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def best_match(Q, norms, q, qnorm):
+        """Index and cosine similarity of the row of Q closest to q."""
+        best_i, best_s = -1, -1.0
+        for i in range(Q.shape[0]):
+            s = 0.0
+            for j in range(Q.shape[1]):
+                s += Q[i, j] * q[j]
+            s /= norms[i] * qnorm
+            if s > best_s:
+                best_s = s
+                best_i = i
+        return best_i, best_s
+else:
+    best_match = _best_match_numpy
+
+
+class QueryCache:
+    """LRU cache of vector_search results, matched by query embedding similarity.
+
+    A lookup hits when the cosine similarity between the new query embedding
+    and a cached one exceeds the threshold, so rephrased repeats of a question
+    skip the vector search.
+    """
+
+    def __init__(self, max_size: int = QUERY_CACHE_SIZE, threshold: float = QUERY_CACHE_THRESHOLD):
+        self.max_size = max_size
+        self.threshold = threshold
+        self.clear()
+
+    def clear(self):
+        self.vectors = None   # (max_size, d) query embeddings
+        self.norms = None     # (max_size,) embedding norms
+        self.last_used = np.zeros(self.max_size, dtype=np.int64)
+        self.results = []
+        self.tick = 0
+
+    def get(self, qvec: np.ndarray):
+        n = len(self.results)
+        qnorm = np.linalg.norm(qvec)
+        if n == 0 or qnorm == 0:
+            return None
+
+        i, sim = best_match(self.vectors[:n], self.norms[:n], qvec, qnorm)
+        if sim <= self.threshold:
+            return None
+
+        self.tick += 1
+        self.last_used[i] = self.tick
+        return self.results[i]
+
+    def put(self, qvec: np.ndarray, result):
+        qnorm = np.linalg.norm(qvec)
+        if qnorm == 0:
+            return
+        if self.vectors is None:
+            self.vectors = np.zeros((self.max_size, qvec.shape[0]), dtype=np.float32)
+            self.norms = np.zeros(self.max_size, dtype=np.float32)
+
+        if len(self.results) < self.max_size:
+            i = len(self.results)
+            self.results.append(result)
+        else:
+            i = int(self.last_used.argmin())  # evict least recently used
+            self.results[i] = result
+
+        self.vectors[i] = qvec
+        self.norms[i] = qnorm
+        self.tick += 1
+        self.last_used[i] = self.tick
+
+
+query_cache = QueryCache()
+
+
+# ============================================================
+# FAISS VECTOR STORE
+# ============================================================
+# At MID scale (≤5K rows) exact search is a single matrix product, so a
+# flat inner-product index over L2-normalized vectors (= cosine) is used.
+# Vectors are keyed by a hash of their document text, so rebuilding from an
+# unchanged dataset only touches rows that were added or removed.
+
+_store = None  # (index, entries) once loaded or built
+
+
+def doc_id(doc: str) -> int:
+    """Deterministic non-negative int64 id for a document."""
+    return int.from_bytes(hashlib.md5(doc.encode("utf-8")).digest()[:8], "big") >> 1
+
+
+def load_store():
+    """Return (index, entries) from disk; entries maps id -> (doc, meta)."""
+    index = faiss.read_index(FAISS_INDEX_PATH)
+    with open(FAISS_DOCS_PATH, "rb") as f:
+        entries = pickle.load(f)
+    return index, entries
+
+
+def save_store(index, entries):
+    global _store
+    os.makedirs(FAISS_DIR, exist_ok=True)
+    faiss.write_index(index, FAISS_INDEX_PATH)
+    with open(FAISS_DOCS_PATH, "wb") as f:
+        pickle.dump(entries, f)
+    _store = (index, entries)
+
+
+def get_store():
+    """Return the (index, entries) pair, reading it from disk only once."""
+    global _store
+    if _store is None:
+        _store = load_store()
+    return _store
+
+
+def embed(text: str) -> np.ndarray:
+    vec = embed_cache.get(text)
+    if vec is None:
+        if TEI_URL:
+            vec = embed_batch([text])[0]
+        else:
+            resp = ollama.embeddings(model=MODEL_EMBED, prompt=text)
+            vec = resp["embedding"]
+        vec = np.asarray(vec, dtype=np.float32)
+        embed_cache.put(text, vec)
+    return vec
+
+
+def embed_request(texts: list[str]):
+    """URL and JSON body of a batch embedding request (TEI or Ollama)."""
+    if TEI_URL:
+        return f"{TEI_URL}/embed", {"inputs": texts}
+    return f"{OLLAMA_HOST}/api/embed", {"model": MODEL_EMBED, "input": texts}
+
+
+def embed_response(data) -> list[list[float]]:
+    # TEI returns the list of vectors itself; Ollama wraps it
+    return data if TEI_URL else data["embeddings"]
+
+
+def embed_batch(texts: list[str]) -> list[list[float]]:
+    """Embed several texts with one request to TEI's /embed or Ollama's /api/embed."""
+    url, body = embed_request(texts)
+    resp = http.post(url, json=body)
+    resp.raise_for_status()
+    return embed_response(resp.json())
+
+
+async def embed_batch_async(session, sem, texts: list[str]) -> list[list[float]]:
+    url, body = embed_request(texts)
+    async with sem:
+        async with session.post(url, json=body) as resp:
+            resp.raise_for_status()
+            return embed_response(await resp.json())
+
+
+async def gather_embeds(batches: list[list[str]]) -> list[list[list[float]]]:
+    """Embed batches concurrently, at most EMBED_PARALLEL requests at a time."""
+    sem = asyncio.Semaphore(EMBED_PARALLEL)
+    async with aiohttp.ClientSession() as session:
+        return await asyncio.gather(
+            *(embed_batch_async(session, sem, b) for b in batches)
         )
 
 
-def embed(text: str):
-    resp = ollama.embeddings(model=MODEL_EMBED, prompt=text)
-    return resp["embedding"]
+def embed_many(texts: list[str]) -> list[np.ndarray]:
+    """Embed texts in batches, skipping any already in the embedding cache."""
+    vecs = embed_cache.get_many(texts)
+    missing = [i for i, v in enumerate(vecs) if v is None]
 
+    if not missing:
+        return vecs
 
-def build_vector_store(df: pd.DataFrame):
-    print("Building vector store...")
+    batches = [
+        [texts[i] for i in missing[start:start + EMBED_BATCH_SIZE]]
+        for start in range(0, len(missing), EMBED_BATCH_SIZE)
+    ]
+    new = [v for batch in asyncio.run(gather_embeds(batches)) for v in batch]
 
-    col = get_collection()
+    embed_cache.put_many([texts[i] for i in missing], new)
+    for i, v in zip(missing, new):
+        vecs[i] = np.asarray(v, dtype=np.float32)
 
-    # Clear old data
-    try:
-        col.delete()
-    except:
-        pass
-
-    docs = []
-    ids = []
-    metas = []
-
-    for i, row in df.iterrows():
-        combined = " ".join([
-            str(row.get("name", "")),
-            str(row.get("productuses", "")),
-            str(row.get("howworks", "")),
-        ])
-
-        chunk = combined[:300].strip()
-        if not chunk:
-            continue
+    return vecs
 
-        docs.append(chunk)
-        ids.append(str(i))
-        metas.append({"name": row.get("name", "")})
 
-    embeddings = [embed(d) for d in docs]
+def text_column(df: pd.DataFrame, name: str) -> pd.Series:
+    """Column as strings with missing values (or a missing column) as ""."""
+    if name not in df.columns:
+        return pd.Series("", index=df.index)
+    return df[name].fillna("").astype(str)
 
-    col.add(
-        documents=docs,
-        ids=ids,
-        embeddings=embeddings,
-        metadatas=metas
-    )
 
+def build_vector_store(df: pd.DataFrame):
+    print("Building vector store...")
+
+    names = text_column(df, "name")
+    combined = (
+        names
+        + " " + text_column(df, "productuses")
+        + " " + text_column(df, "howworks")
+    ).str.slice(0, 300).str.strip()
+
+    mask = combined.str.len() > 0
+    docs = combined[mask].tolist()
+    metas = [{"name": n} for n in names[mask].tolist()]
+
+    wanted = {}
+    for d, m in zip(docs, metas):
+        wanted.setdefault(doc_id(d), (d, m))
+
+    if os.path.exists(FAISS_INDEX_PATH):
+        index, entries = get_store()
+    else:
+        index, entries = None, {}
+
+    # Drop rows that are no longer in the dataset
+    stale = [i for i in entries if i not in wanted]
+    if stale:
+        index.remove_ids(np.array(stale, dtype=np.int64))
+
+    # Only embed and add rows the index does not have yet
+    new_ids = [i for i in wanted if i not in entries]
+    if new_ids:
+        X = np.vstack(embed_many([wanted[i][0] for i in new_ids])).astype(np.float32)
+        faiss.normalize_L2(X)
+        if index is None:
+            index = faiss.IndexIDMap2(faiss.IndexFlatIP(X.shape[1]))
+        index.add_with_ids(X, np.array(new_ids, dtype=np.int64))
+
+    if index is not None:
+        save_store(index, wanted)
+    print(f"Vectors added: {len(new_ids)}, removed: {len(stale)}")
+
+    query_cache.clear()
     print("Vector store built.")
 
 
 def vector_search(query: str):
-    col = get_collection()
     qvec = embed(query)
-    res = col.query(query_embeddings=[qvec], n_results=5)
-    docs = res["documents"][0]
-    metas = res["metadatas"][0]
-    return [{"text": d, "meta": m} for d, m in zip(docs, metas)]
+    cached = query_cache.get(qvec)
+    if cached is not None:
+        return cached
+
+    index, entries = get_store()
+    q = qvec.reshape(1, -1).copy()
+    faiss.normalize_L2(q)
+    _, I = index.search(q, 5)
+    results = [
+        {"text": entries[i][0], "meta": entries[i][1]}
+        for i in I[0] if i != -1
+    ]
+
+    query_cache.put(qvec, results)
+    return results
 
 
 # ============================================================
 # CHAT (MISTRAL)
 # ============================================================
 
-def chat(messages):
-    prompt = ""
-    for m in messages:
-        prompt += f"{m['role']}: {m['content']}\n"
-    prompt += "assistant:"
+def llama_server_stream(messages):
+    """Stream a reply from llama-server's OpenAI-compatible chat endpoint."""
+    resp = http.post(
+        f"{LLAMA_SERVER_URL}/v1/chat/completions",
+        json={
+            "messages": messages,
+            "max_tokens": CHAT_OPTIONS["num_predict"],
+            "stream": True,
+        },
+        stream=True,
+    )
+    resp.raise_for_status()
+    # text/event-stream carries no charset, so requests would guess ISO-8859-1
+    resp.encoding = "utf-8"
 
-    resp = ollama.generate(model=MODEL_CHAT, prompt=prompt)
-    return resp["response"]
+    # Server-sent events: "data: {...}" lines, terminated by "data: [DONE]"
+    for line in resp.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data: "):
+            continue
+        data = line[len("data: "):]
+        if data == "[DONE]":
+            break
+        delta = json.loads(data)["choices"][0]["delta"]
+        if delta.get("content"):
+            yield delta["content"]
+
+
+def chat_stream(messages):
+    """Yield the reply to messages piece by piece as Mistral generates it."""
+    if LLAMA_SERVER_URL:
+        yield from llama_server_stream(messages)
+        return
+
+    for chunk in ollama.chat(
+        model=MODEL_CHAT,
+        messages=messages,
+        options=CHAT_OPTIONS,
+        keep_alive=CHAT_KEEP_ALIVE,
+        stream=True,
+    ):
+        yield chunk["message"]["content"]
+
+
+def chat(messages):
+    return "".join(chat_stream(messages))
 
 
 # ============================================================
@@ -214,7 +543,7 @@ def chat(messages):
 # ============================================================
 
 SQL_SYSTEM = textwrap.dedent("""
-You write SQL for a SQLite table named mid_drugs.
+You write SQL for a DuckDB table named mid_drugs.
 
 VALID COLUMNS:
 name, link, contains, productintroduction, productuses, productbenefits,
@@ -226,9 +555,15 @@ RULES:
 - Never use JOIN
 - Never invent columns
 - If unsure, use:
-  SELECT * FROM mid_drugs WHERE name LIKE '%keyword%' LIMIT 10;
+  SELECT * FROM mid_drugs WHERE name ILIKE '%keyword%' LIMIT 10;
+- Use ILIKE for case-insensitive text matching
 """).strip()
 
+# SQL result columns passed to the answer prompt
+CONTEXT_COLUMNS = ["name", "productuses", "sideeffect", "howworks", "safetyadvice"]
+CONTEXT_MAX_ROWS = 8
+CONTEXT_MAX_CHARS = 400
+
 ANSWER_SYSTEM = textwrap.dedent("""
 You answer using ONLY:
 - SQL rows
@@ -237,6 +572,15 @@ You answer using ONLY:
 Never invent facts.
 """).strip()
 
+# Plain-text context is far fewer tokens than JSON with its quotes and braces
+ANSWER_TEMPLATE = """SQL rows:
+{sql_rows}
+
+Vector documents:
+{vector_docs}
+
+Question: {question}"""
+
 
 def generate_sql(question: str) -> str:
     messages = [
@@ -248,17 +592,33 @@ def generate_sql(question: str) -> str:
 
 
 def answer_hybrid(question: str, df_sql, vec_docs):
-    ctx = {
-        "sql_rows": df_sql.to_dict(orient="records"),
-        "vector_docs": vec_docs
-    }
+    # Keep the prompt short: only answer-relevant columns, few rows, capped cells
+    # (aggregate queries like COUNT(*) keep their own columns)
+    cols = [c for c in CONTEXT_COLUMNS if c in df_sql.columns] or list(df_sql.columns)
+    df_ctx = df_sql[cols].head(CONTEXT_MAX_ROWS)
+
+    # One line per row, leaving out empty cells (decided on the raw value, so
+    # NULLs never reach the prompt as "nan"/"None")
+    sql_rows = "\n".join(
+        "- " + "; ".join(
+            f"{c}: {str(v)[:CONTEXT_MAX_CHARS]}"
+            for c, v in row.items()
+            if pd.notna(v) and str(v)
+        )
+        for row in df_ctx.to_dict(orient="records")
+    )
+    vector_docs = "\n".join(f"* {d['text']}" for d in vec_docs)
 
+    content = ANSWER_TEMPLATE.format(
+        sql_rows=sql_rows or "(none)",
+        vector_docs=vector_docs or "(none)",
+        question=question,
+    )
     messages = [
         {"role": "system", "content": ANSWER_SYSTEM},
-        {"role": "assistant", "content": json.dumps(ctx, indent=2)},
-        {"role": "user", "content": question},
+        {"role": "user", "content": content},
     ]
-    return chat(messages)
+    return chat_stream(messages)
 
 
 def ask_mid(question: str):
@@ -270,14 +630,23 @@ def ask_mid(question: str):
     try:
         df = run_sql(sql)
     except Exception as e:
-        return f"SQL error: {e}"
+        answer = f"SQL error: {e}"
+        print("\nAssistant:", answer)
+        return answer
 
     print("SQL rows:", len(df))
 
     vec = vector_search(question)
     print("Vector matches:", len(vec))
 
-    return answer_hybrid(question, df, vec)
+    # Print the answer as it streams in
+    print("\nAssistant: ", end="", flush=True)
+    parts = []
+    for delta in answer_hybrid(question, df, vec):
+        print(delta, end="", flush=True)
+        parts.append(delta)
+    print()
+    return "".join(parts)
 
 
 # ============================================================
@@ -285,17 +654,15 @@ def ask_mid(question: str):
 # ============================================================
 
 if __name__ == "__main__":
-    # Load or build SQLite
-    if not os.path.exists(DB_PATH):
-        df_mid = load_mid_to_sqlite()
+    # Load or build DuckDB
+    if not os.path.exists(DB_PATH) or not os.path.exists(MID_PARQUET_PATH):
+        df_mid = load_mid_to_duckdb()
     else:
-        conn = sqlite3.connect(DB_PATH)
-        df_mid = pd.read_sql_query(f"SELECT * FROM {TABLE_NAME}", conn)
-        conn.close()
-        print("Loaded MID from SQLite.")
+        df_mid = pd.read_parquet(MID_PARQUET_PATH, memory_map=True)
+        print("Loaded MID from parquet.")
 
     # Build vector store if missing
-    if not os.path.exists(CHROMA_DIR) or not os.listdir(CHROMA_DIR):
+    if not os.path.exists(FAISS_INDEX_PATH):
         build_vector_store(df_mid.head(5000))
     else:
         print("Vector store already exists — skipping embedding.")
@@ -307,5 +674,5 @@ if __name__ == "__main__":
         if q.lower() in {"exit", "quit"}:
             break
 
-        print("\nAssistant:", ask_mid(q))
+        ask_mid(q)
         print("\n" + "=" * 60 + "\n")
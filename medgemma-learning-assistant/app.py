@@ -4,6 +4,7 @@
 # ============================================================
 
 import os
+from itertools import chain
 from pathlib import Path
 
 import streamlit as st
@@ -64,17 +65,23 @@ def chat_tab(embedder, coll, processor, model):
     question = st.chat_input("Ask a medical question")
     if question or (analyze_clicked and uploaded is not None):
         question = question or "Describe the findings in this medical image."
-        if uploaded is not None:
-            image = Image.open(uploaded).convert("RGB")
-            q = question or "Describe the findings in this medical image."
-            with st.spinner("Generating..."):
-                answer, sources = rag_engine.ask_image(image, q, embedder, coll, processor, model)
-            st.session_state.last_question = q
-        else:
-            history = [{"question": h["question"], "answer": h["answer"]} for h in st.session_state.conversation[-6:]]
+        with st.chat_message("user"):
+            st.write(question)
+        with st.chat_message("assistant"):
+            # The stream is lazy, so wait for its first piece under the spinner
+            # too; otherwise the prompt prefill shows nothing
             with st.spinner("Generating..."):
-                answer, sources = rag_engine.ask_text(question, embedder, coll, processor, model, conversation_history=history)
-            st.session_state.last_question = question
+                if uploaded is not None:
+                    image = Image.open(uploaded).convert("RGB")
+                    q = question or "Describe the findings in this medical image."
+                    stream, sources = rag_engine.ask_image_stream(image, q, embedder, coll, processor, model)
+                    st.session_state.last_question = q
+                else:
+                    history = [{"question": h["question"], "answer": h["answer"]} for h in st.session_state.conversation[-6:]]
+                    stream, sources = rag_engine.ask_text_stream(question, embedder, coll, processor, model, conversation_history=history)
+                    st.session_state.last_question = question
+                first = next(stream, "")
+            answer = st.write_stream(chain([first], stream)).strip()
 
         st.session_state.last_answer = answer
         st.session_state.last_sources = sources or []
@@ -187,7 +194,7 @@ def quiz_tab(embedder, coll, processor, model):
 
 def notes_tab():
     st.subheader("My notes")
-    notes = store.get_all_notes()
+    notes = list(store.iter_all_notes())
     if not notes:
         st.info("No saved notes. Use Chat and click 'Save last Q&A to My notes'.")
         return
@@ -200,8 +207,7 @@ def notes_tab():
 
 def export_tab():
     st.subheader("Export notes")
-    notes = store.get_all_notes()
-    if not notes:
+    if not store.get_all_notes(limit=1):
         st.info("No notes to export.")
         return
     if st.button("Export to Markdown"):
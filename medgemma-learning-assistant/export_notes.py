@@ -13,7 +13,7 @@ def export_to_markdown(filepath: str | Path | None = None) -> str:
     if filepath is None:
         filepath = Path(__file__).parent / f"notes_export_{datetime.now().strftime('%Y%m%d_%H%M')}.md"
     filepath = Path(filepath)
-    notes = store.get_all_notes()
+    notes = store.iter_all_notes()
     lines = [
         "# My learning notes",
         f"*Exported {datetime.now().isoformat()}*",
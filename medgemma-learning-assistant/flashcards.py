@@ -81,4 +81,4 @@ def get_review_deck(limit: int = 20) -> list[dict]:
 
 
 def get_all_cards(topic: str | None = None) -> list[dict]:
-    return store.get_all_flashcards(topic=topic)
+    return list(store.iter_all_flashcards(topic=topic))
@@ -5,11 +5,19 @@
 
 import os
 from pathlib import Path
+from threading import Event, Thread
+from typing import Iterator
 
 import chromadb
 from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
-from transformers import AutoProcessor, AutoModelForImageTextToText
+from transformers import (
+    AutoProcessor,
+    AutoModelForImageTextToText,
+    StoppingCriteria,
+    StoppingCriteriaList,
+    TextIteratorStreamer,
+)
 from PIL import Image
 import torch
 
@@ -95,7 +103,7 @@ def _single_answer_only(reply: str) -> str:
     return reply.strip()
 
 
-def generate(processor, model, messages: list, max_new_tokens: int = MAX_NEW_TOKENS) -> str:
+def _prepare_inputs(processor, model, messages: list) -> dict:
     inputs = processor.apply_chat_template(
         messages, add_generation_prompt=True, tokenize=True, return_dict=True, return_tensors="pt"
     )
@@ -109,6 +117,11 @@ def generate(processor, model, messages: list, max_new_tokens: int = MAX_NEW_TOK
             else:
                 v = v.to(device=device)
         out_inputs[k] = v
+    return out_inputs
+
+
+def generate(processor, model, messages: list, max_new_tokens: int = MAX_NEW_TOKENS) -> str:
+    out_inputs = _prepare_inputs(processor, model, messages)
     input_len = out_inputs["input_ids"].shape[-1]
     with torch.inference_mode():
         out = model.generate(**out_inputs, max_new_tokens=max_new_tokens, do_sample=False, pad_token_id=processor.tokenizer.eos_token_id)
@@ -116,6 +129,72 @@ def generate(processor, model, messages: list, max_new_tokens: int = MAX_NEW_TOK
     return _single_answer_only(reply)
 
 
+class _EventStoppingCriteria(StoppingCriteria):
+    """Stops generate() as soon as the event is set."""
+
+    def __init__(self, event: Event):
+        self.event = event
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return torch.full((input_ids.shape[0],), self.event.is_set(), dtype=torch.bool, device=input_ids.device)
+
+
+def generate_stream(processor, model, messages: list, max_new_tokens: int = MAX_NEW_TOKENS) -> Iterator[str]:
+    """Like generate(), but yields the reply text as it is produced."""
+    out_inputs = _prepare_inputs(processor, model, messages)
+    streamer = TextIteratorStreamer(processor.tokenizer, skip_prompt=True, skip_special_tokens=True)
+    stop_event = Event()
+    errors = []
+
+    def run():
+        try:
+            with torch.inference_mode():
+                model.generate(
+                    **out_inputs,
+                    max_new_tokens=max_new_tokens,
+                    do_sample=False,
+                    pad_token_id=processor.tokenizer.eos_token_id,
+                    streamer=streamer,
+                    stopping_criteria=StoppingCriteriaList([_EventStoppingCriteria(stop_event)]),
+                )
+        except BaseException as e:
+            # generate() only ends the streamer on success; without this the
+            # consumer below would wait on it forever
+            errors.append(e)
+            streamer.end()
+
+    worker = Thread(target=run, daemon=True)
+    worker.start()
+
+    # Hold back the current line until it can't be the start of a follow-up
+    # "Question:", which _single_answer_only() would cut off.
+    stop = "\nquestion:"
+    pending = ""
+    try:
+        for text in streamer:
+            pending += text
+            idx = pending.lower().find(stop)
+            if idx != -1:
+                pending = pending[:idx]
+                break
+            cut = pending.rfind("\n")
+            if cut > 0:
+                yield pending[:cut]
+                pending = pending[cut:]
+            elif cut == -1 or len(pending) > len(stop):
+                yield pending
+                pending = ""
+    finally:
+        # Runs on the stop marker and when the caller drops the stream (e.g. a
+        # Streamlit rerun): stop at the next token and wait, so the next
+        # question never runs generate() alongside this one
+        stop_event.set()
+        worker.join()
+    if errors:
+        raise errors[0]
+    yield pending
+
+
 def _format_conversation_memory(history: list[dict]) -> str:
     """history = [{"question": "...", "answer": "..."}, ...]"""
     if not history:
@@ -126,19 +205,7 @@ def _format_conversation_memory(history: list[dict]) -> str:
     return "\n\n".join(parts)
 
 
-def ask_text(
-    question: str,
-    embedder,
-    coll,
-    processor,
-    model,
-    conversation_history: list[dict] | None = None,
-) -> tuple[str, list[str]]:
-    """Returns (answer, list of source chunks for citations)."""
-    chunks = retrieve(embedder, coll, question)
-    if not chunks:
-        return "No relevant context was found for this question.", []
-
+def _text_messages(question: str, chunks: list[str], conversation_history: list[dict] | None) -> list:
     context = "\n\n".join(chunks)
     memory_block = _format_conversation_memory(conversation_history or [])
     if memory_block:
@@ -169,7 +236,28 @@ Question: {question}
 
 Answer:"""
 
-    messages = build_messages_text_only(prompt)
+    return build_messages_text_only(prompt)
+
+
+def _image_messages(image: Image.Image, question: str, chunks: list[str]) -> list:
+    q = question or "Describe the findings in this medical image."
+    return build_messages_image(image, q, rag_context=chunks if chunks else None)
+
+
+def ask_text(
+    question: str,
+    embedder,
+    coll,
+    processor,
+    model,
+    conversation_history: list[dict] | None = None,
+) -> tuple[str, list[str]]:
+    """Returns (answer, list of source chunks for citations)."""
+    chunks = retrieve(embedder, coll, question)
+    if not chunks:
+        return "No relevant context was found for this question.", []
+
+    messages = _text_messages(question, chunks, conversation_history)
     answer = generate(processor, model, messages)
     return answer, chunks
 
@@ -184,12 +272,41 @@ def ask_image(
 ) -> tuple[str, list[str]]:
     """Returns (answer, list of source chunks if RAG used, else [])."""
     chunks = retrieve(embedder, coll, question) if question else []
-    q = question or "Describe the findings in this medical image."
-    messages = build_messages_image(image, q, rag_context=chunks if chunks else None)
+    messages = _image_messages(image, question, chunks)
     answer = generate(processor, model, messages)
     return answer, chunks
 
 
+def ask_text_stream(
+    question: str,
+    embedder,
+    coll,
+    processor,
+    model,
+    conversation_history: list[dict] | None = None,
+) -> tuple[Iterator[str], list[str]]:
+    """Like ask_text(), but returns (answer text stream, source chunks)."""
+    chunks = retrieve(embedder, coll, question)
+    if not chunks:
+        return iter(["No relevant context was found for this question."]), []
+    messages = _text_messages(question, chunks, conversation_history)
+    return generate_stream(processor, model, messages), chunks
+
+
+def ask_image_stream(
+    image: Image.Image,
+    question: str,
+    embedder,
+    coll,
+    processor,
+    model,
+) -> tuple[Iterator[str], list[str]]:
+    """Like ask_image(), but returns (answer text stream, source chunks)."""
+    chunks = retrieve(embedder, coll, question) if question else []
+    messages = _image_messages(image, question, chunks)
+    return generate_stream(processor, model, messages), chunks
+
+
 def is_image_path(s: str) -> bool:
     s = s.strip().strip('"')
     if not s:
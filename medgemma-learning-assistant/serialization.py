@@ -0,0 +1,17 @@
+# ============================================================
+# JSON helpers: orjson when installed, stdlib json otherwise.
+# dumps() always returns str so stored TEXT columns stay compatible.
+# ============================================================
+
+try:
+    import orjson
+
+    def dumps(obj) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+    loads = orjson.loads
+except ImportError:
+    import json
+
+    dumps = json.dumps
+    loads = json.loads
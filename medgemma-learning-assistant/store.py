@@ -2,142 +2,226 @@
 # SQLite store for saved notes and flashcards.
 # ============================================================
 
-import json
 import sqlite3
+import threading
 from datetime import datetime
 from pathlib import Path
+from typing import Iterator
 
-DB_PATH = Path(__file__).parent / "learning_data.db"
+from serialization import dumps, loads
 
+DB_PATH = Path(__file__).parent / "learning_data.db"
 
-def get_conn():
-    Path(DB_PATH).parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+# One connection shared by every call (and by Streamlit's script threads).
+# The schema is set up once, when this module is imported. All threads share
+# the connection's transaction state too, so every helper holds _db_lock from
+# its first execute to its commit.
+_conn: sqlite3.Connection | None = None
+_conn_lock = threading.Lock()
+_db_lock = threading.RLock()
+_initialized = False
+_init_lock = threading.Lock()
+
+# WAL with synchronous=NORMAL needs one fsync per checkpoint instead of two
+# per commit; the rest keeps temp tables and hot pages in memory.
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+)
+
+_SQL_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS notes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        question TEXT NOT NULL,
+        answer TEXT NOT NULL,
+        sources_json TEXT,
+        created_at TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS flashcards (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        front TEXT NOT NULL,
+        back TEXT NOT NULL,
+        topic TEXT,
+        next_review TEXT NOT NULL DEFAULT '',
+        created_at TEXT NOT NULL
+    );
+    -- Databases created before next_review was NOT NULL may still hold
+    -- NULLs; '' sorts first, so those cards stay due.
+    UPDATE flashcards SET next_review = '' WHERE next_review IS NULL;
+    -- Notes are listed by id, so a created_at index would only slow inserts.
+    DROP INDEX IF EXISTS idx_notes_created_at;
+    CREATE INDEX IF NOT EXISTS idx_flashcards_next_review ON flashcards(next_review);
+    CREATE INDEX IF NOT EXISTS idx_flashcards_topic ON flashcards(topic);
+"""
+
+# Every statement is a constant with bound parameters only (no f-strings), so
+# each call reuses identical SQL text and hits sqlite3's statement cache.
+_STATEMENT_CACHE_SIZE = 256
+_SQL_INSERT_NOTE = "INSERT INTO notes (question, answer, sources_json, created_at) VALUES (?, ?, ?, ?)"
+_SQL_SELECT_NOTES = "SELECT id, question, answer, sources_json, created_at FROM notes WHERE id < ? ORDER BY id DESC LIMIT ?"
+_SQL_INSERT_FLASHCARD = "INSERT INTO flashcards (front, back, topic, next_review, created_at) VALUES (?, ?, ?, ?, ?)"
+_SQL_SELECT_FLASHCARDS = "SELECT id, front, back, topic, next_review, created_at FROM flashcards WHERE id > ? ORDER BY id LIMIT ?"
+_SQL_SELECT_FLASHCARDS_BY_TOPIC = (
+    "SELECT id, front, back, topic, next_review, created_at FROM flashcards "
+    "WHERE (topic = ? OR topic = '') AND id > ? ORDER BY id LIMIT ?"
+)
+_SQL_SELECT_DUE_FLASHCARDS = (
+    "SELECT id, front, back, topic FROM flashcards WHERE next_review <= ? ORDER BY next_review, id LIMIT ?"
+)
+_SQL_UPDATE_NEXT_REVIEW = "UPDATE flashcards SET next_review = ? WHERE id = ?"
+
+# Readers return one page at a time, keyed on id (keyset pagination). An absent
+# cursor becomes a sentinel id rather than "? IS NULL OR ...", which would stop
+# SQLite from turning the id bound into a primary-key range.
+PAGE_SIZE = 100
+_MAX_ID = 2**63 - 1
+
+
+def get_conn() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        with _conn_lock:
+            if _conn is None:
+                _conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=_STATEMENT_CACHE_SIZE)
+    return _conn
 
 
 def init_db(conn=None):
-    close = False
-    if conn is None:
-        conn = get_conn()
-        close = True
-    conn.executescript("""
-        CREATE TABLE IF NOT EXISTS notes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            question TEXT NOT NULL,
-            answer TEXT NOT NULL,
-            sources_json TEXT,
-            created_at TEXT NOT NULL
-        );
-        CREATE TABLE IF NOT EXISTS flashcards (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            front TEXT NOT NULL,
-            back TEXT NOT NULL,
-            topic TEXT,
-            next_review TEXT,
-            created_at TEXT NOT NULL
-        );
-    """)
+    """Create tables and tune the connection. Runs once; later calls are no-ops."""
+    global _initialized
+    with _init_lock:
+        if _initialized:
+            return
+        if conn is None:
+            conn = get_conn()
+        with _db_lock:
+            _create_schema(conn)
+            for pragma in _PRAGMAS:
+                conn.execute(pragma)
+        _initialized = True
+
+
+def _create_schema(conn: sqlite3.Connection) -> None:
+    conn.executescript(_SQL_SCHEMA)
     conn.commit()
-    if close:
-        conn.close()
 
 
 # ----- Notes -----
 
 def save_note(question: str, answer: str, sources: list[str] | None = None) -> int:
     conn = get_conn()
-    init_db(conn)
-    sources_json = json.dumps(sources) if sources else None
-    cur = conn.execute(
-        "INSERT INTO notes (question, answer, sources_json, created_at) VALUES (?, ?, ?, ?)",
-        (question, answer, sources_json, datetime.utcnow().isoformat()),
-    )
-    conn.commit()
-    row_id = cur.lastrowid
-    conn.close()
-    return row_id
-
-
-def get_all_notes() -> list[dict]:
-    conn = get_conn()
-    init_db(conn)
-    rows = conn.execute("SELECT id, question, answer, sources_json, created_at FROM notes ORDER BY created_at DESC").fetchall()
-    conn.close()
-    out = []
-    for r in rows:
-        sources = json.loads(r["sources_json"]) if r["sources_json"] else None
-        out.append({
-            "id": r["id"],
-            "question": r["question"],
-            "answer": r["answer"],
-            "sources": sources,
-            "created_at": r["created_at"],
-        })
-    return out
+    sources_json = dumps(sources) if sources else None
+    with _db_lock:
+        cur = conn.execute(
+            _SQL_INSERT_NOTE,
+            (question, answer, sources_json, datetime.utcnow().isoformat()),
+        )
+        conn.commit()
+    return cur.lastrowid
+
+
+def get_all_notes(*, before_id: int | None = None, limit: int = PAGE_SIZE) -> list[dict]:
+    """One page of notes, newest first. Pass the last returned id as before_id for the next page."""
+    params = (_MAX_ID if before_id is None else before_id, limit)
+    with _db_lock:
+        rows = get_conn().execute(_SQL_SELECT_NOTES, params).fetchall()
+    return [
+        {
+            "id": id_,
+            "question": question,
+            "answer": answer,
+            "sources": loads(sources_json) if sources_json else None,
+            "created_at": created_at,
+        }
+        for id_, question, answer, sources_json, created_at in rows
+    ]
+
+
+def iter_all_notes() -> Iterator[dict]:
+    """Yield every note newest first, fetching one page at a time."""
+    before_id = None
+    while True:
+        page = get_all_notes(before_id=before_id)
+        yield from page
+        if len(page) < PAGE_SIZE:
+            return
+        before_id = page[-1]["id"]
 
 
 # ----- Flashcards -----
 
 def save_flashcard(front: str, back: str, topic: str | None = None) -> int:
     conn = get_conn()
-    init_db(conn)
-    cur = conn.execute(
-        "INSERT INTO flashcards (front, back, topic, next_review, created_at) VALUES (?, ?, ?, ?, ?)",
-        (front, back, topic or "", datetime.utcnow().isoformat(), datetime.utcnow().isoformat()),
-    )
-    conn.commit()
-    row_id = cur.lastrowid
-    conn.close()
-    return row_id
+    now = datetime.utcnow().isoformat()
+    with _db_lock:
+        cur = conn.execute(_SQL_INSERT_FLASHCARD, (front, back, topic or "", now, now))
+        conn.commit()
+    return cur.lastrowid
 
 
 def save_flashcards(cards: list[dict], topic: str | None = None) -> int:
     """cards = [{"front": "...", "back": "..."}, ...]"""
     conn = get_conn()
-    init_db(conn)
     now = datetime.utcnow().isoformat()
-    for c in cards:
-        conn.execute(
-            "INSERT INTO flashcards (front, back, topic, next_review, created_at) VALUES (?, ?, ?, ?, ?)",
-            (c.get("front", ""), c.get("back", ""), topic or "", now, now),
+    rows = [(c.get("front", ""), c.get("back", ""), topic or "", now, now) for c in cards]
+    with _db_lock, conn:  # one transaction for the whole batch
+        conn.executemany(
+            _SQL_INSERT_FLASHCARD,
+            rows,
         )
-    conn.commit()
-    count = len(cards)
-    conn.close()
-    return count
+    return len(cards)
 
 
-def get_all_flashcards(topic: str | None = None) -> list[dict]:
+def get_all_flashcards(
+    topic: str | None = None, *, after_id: int | None = None, limit: int = PAGE_SIZE
+) -> list[dict]:
+    """One page of flashcards in id order. Pass the last returned id as after_id for the next page."""
     conn = get_conn()
-    init_db(conn)
-    if topic:
-        rows = conn.execute(
-            "SELECT id, front, back, topic, next_review, created_at FROM flashcards WHERE topic = ? OR topic = '' ORDER BY id",
-            (topic,),
-        ).fetchall()
-    else:
-        rows = conn.execute("SELECT id, front, back, topic, next_review, created_at FROM flashcards ORDER BY id").fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+    after_id = 0 if after_id is None else after_id
+    with _db_lock:
+        if topic:
+            rows = conn.execute(_SQL_SELECT_FLASHCARDS_BY_TOPIC, (topic, after_id, limit)).fetchall()
+        else:
+            rows = conn.execute(_SQL_SELECT_FLASHCARDS, (after_id, limit)).fetchall()
+    return [
+        {"id": i, "front": f, "back": b, "topic": t, "next_review": nr, "created_at": c}
+        for i, f, b, t, nr, c in rows
+    ]
+
+
+def iter_all_flashcards(topic: str | None = None) -> Iterator[dict]:
+    """Yield every flashcard in id order, fetching one page at a time."""
+    after_id = None
+    while True:
+        page = get_all_flashcards(topic, after_id=after_id)
+        yield from page
+        if len(page) < PAGE_SIZE:
+            return
+        after_id = page[-1]["id"]
 
 
 def get_flashcards_for_review(limit: int = 20) -> list[dict]:
-    """Return cards due for review (next_review <= now or null)."""
+    """Return cards due for review (next_review <= now; '' = never reviewed)."""
     conn = get_conn()
-    init_db(conn)
     now = datetime.utcnow().isoformat()
-    rows = conn.execute(
-        "SELECT id, front, back, topic FROM flashcards WHERE next_review IS NULL OR next_review <= ? ORDER BY id LIMIT ?",
-        (now, limit),
-    ).fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+    with _db_lock:
+        rows = conn.execute(_SQL_SELECT_DUE_FLASHCARDS, (now, limit)).fetchall()
+    return [{"id": i, "front": f, "back": b, "topic": t} for i, f, b, t in rows]
 
 
-def update_flashcard_review(card_id: int, next_review_iso: str) -> None:
+def update_flashcard_reviews(pairs: list[tuple[str, int]]) -> None:
+    """pairs = [(next_review_iso, card_id), ...], applied in one transaction."""
     conn = get_conn()
-    conn.execute("UPDATE flashcards SET next_review = ? WHERE id = ?", (next_review_iso, card_id))
-    conn.commit()
-    conn.close()
+    with _db_lock, conn:
+        conn.executemany(_SQL_UPDATE_NEXT_REVIEW, pairs)
+
+
+def update_flashcard_review(card_id: int, next_review_iso: str) -> None:
+    update_flashcard_reviews([(next_review_iso, card_id)])
+
+
+Path(DB_PATH).parent.mkdir(parents=True, exist_ok=True)
+init_db()